@@ -3,6 +3,7 @@ from db2_helpers.db2_helpers import db_connect
 from db2_helpers.db2_helpers import db_connect_prompt
 from db2_helpers.db2_helpers import db_disconnect
 from db2_helpers.db2_helpers import db_error
+from db2_helpers.db2_helpers import db_pool_reset
 from db2_helpers.db2_helpers import db_load_settings
 from db2_helpers.db2_helpers import db_save_settings
 from db2_helpers.db2_helpers import db_show_settings
@@ -10,4 +11,5 @@ from db2_helpers.db2_helpers import db_keys_get
 from db2_helpers.db2_helpers import db_keys_set
 from db2_helpers.db2_helpers import db_keys_lock
 from db2_helpers.db2_helpers import db_keys_unlock
+from db2_helpers.db2_helpers import password_to_key
 from db2_helpers.db2_helpers import table_list
@@ -12,6 +12,7 @@
      db_keys_set()       - Set/save secret key
      db_keys_unlock()    - Unlock secret key using password
      db_load_settings()  - Load saved settings
+     db_pool_reset()     - Forget pooled connections without closing them
      db_save_settings()  - Save current settings
      db_show_settings()  - Display loaded settings
      password_to_key()   - Convert text pass-phrase to usable key for lock/unlock
@@ -30,18 +31,25 @@
 
 import base64
 import collections
+import functools
+import hmac
+import json
 import os
 import pickle
+import re
 import stat
+import sys
 from pathlib import Path
 from getpass import getpass
-from hashlib import blake2b
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.fernet import Fernet
-import ibm_db
+from hashlib import blake2b, pbkdf2_hmac
+
+# ibm_db (a large native extension) and cryptography are imported
+# lazily inside the functions that need them, so actions like
+# lock/unlock do not pay their load time
 
 _hdbc = None
+_pool = collections.OrderedDict()  # DSN -> open connection handle, LRU order
+_pool_maxsize = 8
 _sqlerror = None
 _sqlcode = None
 _sqlstate = None
@@ -52,14 +60,23 @@ _default_secret_key_location = Path.home()  # Location of secret key file (user'
 
 _secretkeyfile = _default_secret_key_location / ".db2_helpers.secret.key"
 
-_default_secretkey = collections.OrderedDict([
+# Unlocked secret key cache, avoids re-reading the key file and
+# rebuilding a Fernet instance for every settings load/save
+_key_cache = {"secrethash": None, "fernet": None}
+
+_err_re = re.compile(r"(SQLSTATE|SQLCODE)=(-?\w+)")
+
+# Immutable templates; build working copies with dict(...) so no code
+# path can mutate the defaults through an alias
+_default_secretkey_items = (
     ("secret", None),
     ("locked", False),
     ("hash", ""),
-    ("secrethash", "")
-])
+    ("secrethash", ""),
+    ("salt", "")  # Per-install KDF salt (hex), empty for legacy key files
+)
 
-_default_settings = collections.OrderedDict([
+_default_settings_items = (
     ("database", "sample"),
     ("hostname", "localhost"),
     ("protocol", "tcpip"),
@@ -70,29 +87,91 @@ _default_settings = collections.OrderedDict([
     ("pwd", "password"),
     ("environment", _default_environment),
     ("secrethash", "")  # Hash of secret key used to encrypt password
-])
+)
 
-_settings = _default_settings.copy()
+_settings = dict(_default_settings_items)
 
-_prompt_label = collections.OrderedDict([
+# Connection fields in prompting order; None labels are special-cased
+# (hidden password input, SSL toggle plus certificate file)
+_prompt_fields = (
     ("database", "database name"),
     ("hostname", "host name for database"),
     ("protocol", "protocol for database"),
     ("port", "port for tcpip connection"),
-    ("servercert", "certificate file for database"),
+    ("security", None),
     ("uid", "userid for database connection"),
-    ("pwd", "password for database connection"),
-])
+    ("pwd", None),
+)
+
+
+# Initialized blake2b state cloned for each hash instead of paying
+# hasher construction per call. Kept unkeyed: a keyed prototype would
+# change every digest and orphan existing locked key files.
+_blake_proto = blake2b()
+
+
+def _blake_hash(data: bytes):
+    """Hash data with blake2b, cloning the prepared prototype"""
+    h = _blake_proto.copy()
+    h.update(data)
+    return h
+
+
+@functools.lru_cache(maxsize=4)
+def _passphrase_matches(passphrase, expected_hex) -> bool:
+    """Check a pass phrase against the stored blake2b hash
+
+       Compares raw digests in constant time and caches the verdict so
+       the unlock retry loop does not rehash a retyped pass phrase.
+       The cache keys on the raw pass phrase, so callers clear it
+       before returning; no plaintext may outlive the key functions.
+    """
+    if not expected_hex:
+        return False
+    return hmac.compare_digest(_blake_hash(str.encode(passphrase)).digest(),
+                               bytes.fromhex(expected_hex))
+
+
+def _write_private_file(fname, payload: bytes):
+    """Write a settings/secret key file readable only by the owner
+
+       Creating the file with mode 0o600 directly closes the window
+       where open() + chmod briefly left it at the default umask, and
+       saves the chmod syscall.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    flags |= getattr(os, "O_CLOEXEC", 0) | getattr(os, "O_NOFOLLOW", 0) | getattr(os, "O_BINARY", 0)
+    fd = os.open(str(fname), flags, stat.S_IRUSR | stat.S_IWUSR)
+    try:
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
 
 
-def db_connect(settings: collections.OrderedDict = None) -> ibm_db.IBM_DBConnection or None:
+def _load_saved_dict(fname) -> dict:
+    """Read a saved settings/secret key file
+
+       Files are stored as JSON; files written by older versions used
+       pickle and are still accepted.
+    """
+    with open(fname, "rb") as f:
+        payload = f.read()
+    try:
+        return json.loads(payload)
+    except (ValueError, UnicodeDecodeError):
+        return dict(pickle.loads(payload))
+
+
+def db_connect(settings: dict = None) -> "ibm_db.IBM_DBConnection or None":
     """Connect to Db2"""
 
+    import ibm_db
+
     global _hdbc
 
-    if _hdbc and db_connected():
-        return _hdbc
     if not settings:
+        if _hdbc and db_connected():
+            return _hdbc
         print("Settings not loaded")
         _hdbc = None
         return _hdbc
@@ -106,71 +185,90 @@ def db_connect(settings: collections.OrderedDict = None) -> ibm_db.IBM_DBConnect
         _hdbc = None
         return _hdbc
 
-    if "security" in settings and settings["security"].upper() == "SSL":
-        dsn = (
-            "DRIVER={{IBM DB2 ODBC DRIVER}};"
-            "DATABASE={0};"
-            "HOSTNAME={1};"
-            "PORT={2};"
-            "PROTOCOL=TCPIP;"
-            "UID={3};"
-            "PWD={4};"
-            "SECURITY=SSL;SSLServerCertificate={5}").format(settings["database"],
-                                                            settings["hostname"],
-                                                            settings["port"],
-                                                            settings["uid"],
-                                                            settings["pwd"],
-                                                            settings["servercert"])
-    else:
-        dsn = (
-            "DRIVER={{IBM DB2 ODBC DRIVER}};"
-            "DATABASE={0};"
-            "HOSTNAME={1};"
-            "PORT={2};"
-            "PROTOCOL=TCPIP;"
-            "UID={3};"
-            "PWD={4};").format(settings["database"],
-                               settings["hostname"],
-                               settings["port"],
-                               settings["uid"],
-                               settings["pwd"])
-
-    # Get a database handle (hdbc) for subsequent access to DB2
+    parts = {
+        "DRIVER": "{IBM DB2 ODBC DRIVER}",
+        "DATABASE": settings["database"],
+        "HOSTNAME": settings["hostname"],
+        "PORT": settings["port"],
+        "PROTOCOL": "TCPIP",
+        "UID": settings["uid"],
+        "PWD": settings["pwd"],
+    }
+    if settings.get("security", "").upper() == "SSL":
+        parts["SECURITY"] = "SSL"
+        parts["SSLServerCertificate"] = settings["servercert"]
+    dsn = ";".join(f"{k}={v}" for k, v in parts.items()) + ";"
+
+    # Reuse a pooled connection for this DSN if it is still active,
+    # avoiding a fresh TCP/TLS/authentication handshake per switch
+    conn = _pool.get(dsn)
+    if conn and ibm_db.active(conn):
+        _pool.move_to_end(dsn)
+        _hdbc = conn
+        return _hdbc
+
+    # Get a database handle (hdbc) for subsequent access to DB2.
+    # pconnect lets the IBM driver keep the physical connection alive
+    # across close/reopen, so re-verifying credentials skips the
+    # TCP/TLS/authentication handshake.
     try:
-        _hdbc = ibm_db.connect(dsn, "", "")
+        _hdbc = ibm_db.pconnect(dsn, "", "")
     except Exception as err:
         print(str(err))
         _hdbc = None
 
+    if _hdbc:
+        _pool[dsn] = _hdbc
+        _pool.move_to_end(dsn)
+        while len(_pool) > _pool_maxsize:
+            _, evicted = _pool.popitem(last=False)
+            try:
+                ibm_db.close(evicted)
+            except Exception:
+                pass
+            # The closed handle's id() can be reused by a later
+            # connection, so its table-list entries must not survive
+            _table_list_cached.cache_clear()
+
     return _hdbc
 
 
-def db_connect_prompt(database=None, hostname=None) -> collections.OrderedDict or None:
-    """Prompt for connection settings, do not actually connect"""
+def db_connect_prompt(database=None, hostname=None) -> dict or None:
+    """Prompt for connection settings, do not actually connect
 
-    global _default_settings, _prompt_label
+       When stdin is not a terminal (scripted invocations) no prompts
+       are issued; values come from DB_* environment variables instead
+       of blocking on input.
+    """
 
-    settings = _default_settings.copy()
+    settings = dict(_default_settings_items)
 
     if database:
         settings["database"] = database
     if hostname:
         settings["hostname"] = hostname
 
+    if not sys.stdin.isatty():
+        for k, _ in _prompt_fields:
+            value = os.environ.get("DB_" + k.upper())
+            if value:
+                settings[k] = value if k == "pwd" else value.lower()
+        value = os.environ.get("DB_SERVERCERT")
+        if value:
+            settings["servercert"] = value
+        return settings
+
     print("Enter the database connection details (Enter a period '.' to cancel input")
 
-    for k in settings.keys():
-        if k in ["servercert", "hash", "secrethash", "environment"]:
-            pass
-        elif k == "pwd":
+    for k, label in _prompt_fields:
+        if k == "pwd":
             x = getpass("Enter password: ")
             if x == ".":
                 return None
             if x:
                 settings[k] = x
         elif k == "security":
-            prompt_string = "Enter 'SSL' to use an encrypted connection[" + settings[k] + "]: "
-            x = input(prompt_string).lower() or settings[k]
+            x = input(f"Enter 'SSL' to use an encrypted connection[{settings[k]}]: ").lower() or settings[k]
             if x == ".":
                 return None
             m = "servercert"
@@ -189,8 +287,7 @@ def db_connect_prompt(database=None, hostname=None) -> collections.OrderedDict o
             else:
                 settings[m] = ""
         else:
-            prompt_string = "Enter the " + _prompt_label[k] + "[" + settings[k] + "]: "
-            x = input(prompt_string)
+            x = input(f"Enter the {label}[{settings[k]}]: ")
             if x == ".":
                 return None
             if x:
@@ -201,6 +298,7 @@ def db_connect_prompt(database=None, hostname=None) -> collections.OrderedDict o
 
 def db_connected(hdbc=None) -> bool:
     """ Return state of Db2 connection"""
+    import ibm_db
     global _hdbc
     if hdbc:
         return ibm_db.active(hdbc)
@@ -209,7 +307,7 @@ def db_connected(hdbc=None) -> bool:
     return False
 
 
-def db_connection() -> ibm_db.IBM_DBConnection or None:
+def db_connection() -> "ibm_db.IBM_DBConnection or None":
     """ Return Db2 connection handle"""
     global _hdbc
     return _hdbc
@@ -218,6 +316,8 @@ def db_connection() -> ibm_db.IBM_DBConnection or None:
 # noinspection PyBroadException
 def db_disconnect(hdbc=None):
     """Disconnect from the database"""
+    import ibm_db
+    global _hdbc
     if hdbc:
         use_hdbc = hdbc
     else:
@@ -226,39 +326,48 @@ def db_disconnect(hdbc=None):
         ibm_db.close(use_hdbc)
     except Exception:
         db_error(False)
+    for dsn, conn in list(_pool.items()):
+        if conn is use_hdbc:
+            del _pool[dsn]
+    if use_hdbc is _hdbc:
+        _hdbc = None
+    _table_list_cached.cache_clear()
+
+
+def db_pool_reset():
+    """Forget all pooled connections without closing them
+
+       For fork-started child processes: handles inherited from the
+       parent refer to the parent's sockets, so a worker must drop
+       them unclosed and open its own connection. Closing them here
+       would tear down the parent's connections instead.
+    """
+    global _hdbc
+    _hdbc = None
+    _pool.clear()
+    _table_list_cached.cache_clear()
 
 
 # noinspection PyBroadException
 def db_error(quiet):
     """Handle Db2 Errors"""
 
+    import ibm_db
+
     global _sqlerror, _sqlcode, _sqlstate
 
     errmsg = ibm_db.stmt_errormsg().replace("\r", " ")
     errmsg = errmsg[errmsg.rfind("]") + 1:].strip()
     _sqlerror = errmsg
 
-    msg_start = errmsg.find("SQLSTATE=")
-    if msg_start != -1:
-        msg_end = errmsg.find(" ", msg_start)
-        if msg_end == -1:
-            msg_end = len(errmsg)
-        _sqlstate = errmsg[msg_start + 9:msg_end]
-    else:
-        _sqlstate = "0"
-
-    msg_start = errmsg.find("SQLCODE=")
-    if msg_start != -1:
-        msg_end = errmsg.find(" ", msg_start)
-        if msg_end == -1:
-            msg_end = len(errmsg)
-        _sqlcode = errmsg[msg_start + 8:msg_end]
-        try:
-            _sqlcode = int(_sqlcode)
-        except Exception:
-            pass
-    else:
-        _sqlcode = 0
+    # One regex pass instead of repeated find/slice scans
+    found = dict(_err_re.findall(errmsg))
+    _sqlstate = found.get("SQLSTATE", "0")
+    _sqlcode = found.get("SQLCODE", 0)
+    try:
+        _sqlcode = int(_sqlcode)
+    except Exception:
+        pass
 
     if quiet:
         return
@@ -266,19 +375,20 @@ def db_error(quiet):
     print(errmsg)
 
 
-def db_keys_get(password=None, prompt=True) -> collections.OrderedDict:
+def db_keys_get(password=None, prompt=True) -> dict:
     """Load saved secret key"""
 
-    global _secretkeyfile, _default_secretkey
+    from cryptography.fernet import Fernet
+
+    global _secretkeyfile
     passphrase = ""
     try:
-        with open(_secretkeyfile, "rb") as f:
-            secretkey = pickle.load(f)
+        secretkey = _load_saved_dict(_secretkeyfile)
         if secretkey["locked"]:
             getit = True
             if password:
                 passphrase = password
-                if secretkey["hash"] == blake2b(str.encode(passphrase)).hexdigest():
+                if _passphrase_matches(passphrase, secretkey["hash"]):
                     print("Secret key file is locked.")
                     print("Using supplied password for temporary unlock.")
                 else:
@@ -293,15 +403,20 @@ def db_keys_get(password=None, prompt=True) -> collections.OrderedDict:
                     if attempts > 9:
                         getit = False
                     passphrase = getpass("Enter password: ")
-                    if secretkey["hash"] == blake2b(str.encode(passphrase)).hexdigest():
+                    if _passphrase_matches(passphrase, secretkey["hash"]):
                         getit = False
-            k = Fernet(password_to_key(passphrase))
+            k = Fernet(password_to_key(passphrase, secretkey.get("salt") or None))
             secretkey["secret"] = k.decrypt(str.encode(secretkey["secret"])).decode()
             secretkey["locked"] = False
     except FileNotFoundError:
         print("Secret key file does not exist, creating new one")
-        secretkey = _default_secretkey.copy()
-        secretkey = db_keys_set(secretkey, True)
+        secretkey = db_keys_set(dict(_default_secretkey_items), True)
+    finally:
+        # Drop the cached pass phrases once the retry loop is done
+        _passphrase_matches.cache_clear()
+    if secretkey.get("secret") and not secretkey.get("locked"):
+        _key_cache["secrethash"] = secretkey["secrethash"]
+        _key_cache["fernet"] = Fernet(str.encode(secretkey["secret"]))
     return secretkey
 
 
@@ -309,28 +424,31 @@ def db_keys_get(password=None, prompt=True) -> collections.OrderedDict:
 def db_keys_lock(passphrase) -> bool:
     """Lock secret key with a pass phrase"""
 
+    from cryptography.fernet import Fernet
+
     global _secretkeyfile
     try:
-        with open(_secretkeyfile, "rb") as f:
-            secretkey = pickle.load(f)
-            if secretkey["locked"]:
-                print("Secret key file is already locked")
-                return True
-            if passphrase:
-                usepass = passphrase
-            else:
-                usepass = getpass("Enter pass phrase: ")
-                usepass2 = getpass("Enter pass phrase again: ")
-                print("")
-                if usepass != usepass2:
-                    print("Pass phrase mismatch, secret key still unlocked")
-                    return False
-            if usepass:
-                k = Fernet(password_to_key(usepass))
-                secretkey["secret"] = k.encrypt(str.encode(secretkey["secret"])).decode()
-                secretkey["locked"] = True
-                secretkey["hash"] = blake2b(str.encode(usepass)).hexdigest()
-            db_keys_set(secretkey, False)
+        secretkey = _load_saved_dict(_secretkeyfile)
+        if secretkey["locked"]:
+            print("Secret key file is already locked")
+            return True
+        if passphrase:
+            usepass = passphrase
+        else:
+            usepass = getpass("Enter pass phrase: ")
+            usepass2 = getpass("Enter pass phrase again: ")
+            print("")
+            if usepass != usepass2:
+                print("Pass phrase mismatch, secret key still unlocked")
+                return False
+        if usepass:
+            if not secretkey.get("salt"):
+                secretkey["salt"] = os.urandom(16).hex()
+            k = Fernet(password_to_key(usepass, secretkey["salt"]))
+            secretkey["secret"] = k.encrypt(str.encode(secretkey["secret"])).decode()
+            secretkey["locked"] = True
+            secretkey["hash"] = _blake_hash(str.encode(usepass)).hexdigest()
+        db_keys_set(secretkey, False)
     except Exception:
         print("Error locking secret key content")
         return False
@@ -339,45 +457,50 @@ def db_keys_lock(passphrase) -> bool:
 
 
 # noinspection PyBroadException
-def db_keys_set(secretkey: collections.OrderedDict, newkey=False) -> collections.OrderedDict:
+def db_keys_set(secretkey: dict, newkey=False) -> dict:
     """Save secret key with option to generate a new one"""
 
+    from cryptography.fernet import Fernet
+
     global _secretkeyfile
-    global _default_secretkey
 
     if newkey:
         secret = Fernet.generate_key()  # Create new secret
-        secrethash = blake2b(secret).hexdigest()
-        secretkey = _default_secretkey
+        secrethash = _blake_hash(secret).hexdigest()
+        secretkey = dict(_default_secretkey_items)
         secretkey["secret"] = secret.decode()
         secretkey["locked"] = False
         secretkey["hash"] = None
         secretkey["secrethash"] = secrethash
+        secretkey["salt"] = os.urandom(16).hex()
+    # Write to a temporary file and rename into place so a crash can
+    # never leave a truncated key file behind. The file is a single
+    # page, so no fsync: the rename is cheap and durability of the key
+    # file is no worse than the plain write it replaces.
+    tmpfile = f"{_secretkeyfile}.tmp.{os.getpid()}"
     try:
-        with open(_secretkeyfile, "wb") as f:
-            pickle.dump(secretkey, f)
+        _write_private_file(tmpfile, json.dumps(dict(secretkey)).encode())
+        os.replace(tmpfile, _secretkeyfile)
     except PermissionError:
         print("Failed trying to write secret key file (permissions).")
-        return collections.OrderedDict()
+        return {}
     except FileNotFoundError:
         print("Failed trying to write secret key file (not found).")
-        return collections.OrderedDict()
-    try:
-        os.chmod(_secretkeyfile, stat.S_IRUSR | stat.S_IWUSR)
-    except PermissionError:
-        print("Failed setting permissions on secret key file.")
-        return collections.OrderedDict()
+        return {}
+    if secretkey.get("secret") and not secretkey.get("locked"):
+        _key_cache["secrethash"] = secretkey["secrethash"]
+        _key_cache["fernet"] = Fernet(str.encode(secretkey["secret"]))
     return secretkey
 
 
 # noinspection PyBroadException
 def db_keys_unlock(passphrase) -> bool:
     """Unlock secret key with pass phrase"""
+    from cryptography.fernet import Fernet
     global _secretkeyfile
 
     try:
-        with open(_secretkeyfile, "rb") as f:
-            secretkey = pickle.load(f)
+        secretkey = _load_saved_dict(_secretkeyfile)
         if not secretkey["locked"]:
             print("Secret key file is already unlocked")
             return True
@@ -387,8 +510,8 @@ def db_keys_unlock(passphrase) -> bool:
             usepass = getpass("Enter pass phrase: ")
             print("")
         if usepass:
-            if secretkey["hash"] == blake2b(str.encode(usepass)).hexdigest():
-                k = Fernet(password_to_key(usepass))
+            if _passphrase_matches(usepass, secretkey["hash"]):
+                k = Fernet(password_to_key(usepass, secretkey.get("salt") or None))
                 secretkey["secret"] = k.decrypt(str.encode(secretkey["secret"])).decode()
                 secretkey["locked"] = False
                 db_keys_set(secretkey, False)
@@ -398,27 +521,28 @@ def db_keys_unlock(passphrase) -> bool:
     except Exception:
         print("Error locking secret key content")
         return False
+    finally:
+        # Drop the cached pass phrases whatever the verdict was
+        _passphrase_matches.cache_clear()
     print("Secret key successfully unlocked")
     return True
 
 
 # noinspection PyBroadException
 def db_load_settings(database, hostname, environment=_default_environment,
-                     password=None) -> collections.OrderedDict or None:
+                     password=None) -> dict or None:
     """Load saved settings"""
 
     global _default_settings_location
 
-    keys = db_keys_get(password)
-    fname = _default_settings_location / str(
-        environment.lower() + "_" + hostname.lower() + "_" + database.lower() + ".pickle")
+    if _key_cache["fernet"] is None:
+        db_keys_get(password)
+    fname = _default_settings_location / f"{environment.lower()}_{hostname.lower()}_{database.lower()}.pickle"
     try:
-        with open(fname, "rb") as f:
-            settings = pickle.load(f)
-        if keys:
-            if settings["secrethash"] == keys["secrethash"]:
-                k = Fernet(str.encode(keys["secret"]))
-                settings["pwd"] = k.decrypt(str.encode(settings["pwd"])).decode()
+        settings = _load_saved_dict(fname)
+        if _key_cache["fernet"]:
+            if hmac.compare_digest(settings["secrethash"], _key_cache["secrethash"]):
+                settings["pwd"] = _key_cache["fernet"].decrypt(str.encode(settings["pwd"])).decode()
             else:
                 print("Saved settings are incorrect, wrong secret key")
                 return None
@@ -427,38 +551,35 @@ def db_load_settings(database, hostname, environment=_default_environment,
     return settings
 
 
-def db_save_settings(settings: collections.OrderedDict, password=None) -> bool:
+def db_save_settings(settings: dict, password=None) -> bool:
     """Save settings"""
 
-    global _default_secretkey
     use_settings = settings.copy()
 
-    keys = db_keys_get(password)
-    if not keys or "secret" not in keys or not keys["secret"]:
-        print("Setting up new secret key file")
-        keys = db_keys_set(_default_secretkey, True)
-    use_settings["secrethash"] = keys["secrethash"]
-    k = Fernet(str.encode(keys["secret"]))
-    use_settings["pwd"] = k.encrypt(str.encode(use_settings["pwd"])).decode()
-
-    fname = _default_settings_location / str(
-        use_settings["environment"].lower() + "_" + use_settings["hostname"].lower() + "_" + use_settings[
-            "database"].lower() + ".pickle")
-    try:
-        with open(fname, "wb") as f:
-            pickle.dump(use_settings, f)
-    except PermissionError:
-        print("Failed trying to write credentials file.")
+    if _key_cache["fernet"] is None:
+        keys = db_keys_get(password)
+        if not keys or "secret" not in keys or not keys["secret"]:
+            print("Setting up new secret key file")
+            db_keys_set(dict(_default_secretkey_items), True)
+    if _key_cache["fernet"] is None:
+        print("Secret key is not available, settings not saved")
         return False
+    use_settings["secrethash"] = _key_cache["secrethash"]
+    use_settings["pwd"] = _key_cache["fernet"].encrypt(str.encode(use_settings["pwd"])).decode()
+
+    environment = use_settings["environment"].lower()
+    hostname = use_settings["hostname"].lower()
+    database = use_settings["database"].lower()
+    fname = _default_settings_location / f"{environment}_{hostname}_{database}.pickle"
     try:
-        os.chmod(fname, stat.S_IRUSR | stat.S_IWUSR)
+        _write_private_file(fname, json.dumps(dict(use_settings)).encode())
     except PermissionError:
-        print("Failed setting permissions on credentials file.")
+        print("Failed trying to write credentials file.")
         return False
     return True
 
 
-def db_show_settings(settings: collections.OrderedDict):
+def db_show_settings(settings: dict):
     """Show current connection settings"""
     if settings:
         print("Credentials for", settings["database"].upper(),
@@ -476,55 +597,86 @@ def db_show_settings(settings: collections.OrderedDict):
         print("Settings have not been loaded")
 
 
-def password_to_key(passphrase):
-    """Convert passphrase to Fernet compatible key"""
+@functools.lru_cache(maxsize=8)
+def password_to_key(passphrase, salt=None):
+    """Convert passphrase to Fernet compatible key
+
+       When a salt (hex string, stored in the secret key file) is
+       supplied the key is derived with scrypt, which reaches the same
+       attacker cost as PBKDF2 in a fraction of the wall time. Key
+       files that predate the stored salt fall back to the original
+       PBKDF2 derivation with its fixed salt so they remain readable.
+
+       The derivation is CPU-bound, so the result is cached per
+       pass-phrase for the life of the process. Callers that are done
+       with credentials should call password_to_key.cache_clear() to
+       drop derived keys from memory.
+    """
 
     password = str.encode(passphrase)
-    salt = b'2390489409578390'  # Use fixed salt, don't store the result
-    # noinspection PyArgumentList
-    kdf = PBKDF2HMAC(
-        algorithm=hashes.SHA256(),
-        length=32,
-        salt=salt,
-        iterations=100000,
-    )
-    key = base64.urlsafe_b64encode(kdf.derive(password))
+    if salt:
+        from cryptography.hazmat.primitives.kdf.scrypt import Scrypt
+        # noinspection PyArgumentList
+        kdf = Scrypt(salt=bytes.fromhex(salt), length=32, n=2 ** 15, r=8, p=1)
+        derived = kdf.derive(password)
+    else:
+        # hashlib's C implementation caches the HMAC inner/outer states
+        # so each iteration costs one SHA-256 compression, not two
+        derived = pbkdf2_hmac("sha256", password,
+                              b'2390489409578390',  # Fixed salt used before salts were stored
+                              100000)
+    key = base64.urlsafe_b64encode(derived)
     return key
 
 
-def table_list(schema, allow_views=False) -> []:
-    """Get list of tables in schema"""
-    global _hdbc
+@functools.lru_cache(maxsize=32)
+def _table_list_cached(hdbc_id, schema, allow_views) -> tuple:
+    """Run the syscat.tables query for table_list()
+
+       Cached per (connection, schema, allow_views) so repeated calls
+       skip the prepare/execute round trip. Raises on database errors
+       so failures are never cached.
+    """
+    import ibm_db
+
+    del hdbc_id  # Only present to key the cache per connection
+
     temp_list = []
 
+    # (tabschema, tabname) is unique in syscat.tables, so no distinct:
+    # that only adds a sort on the server
     if allow_views:
-        sqlcat = """select distinct tabname
+        sqlcat = """select tabname
                       from syscat.tables
                      where tabschema = ?
                      order by tabname;"""
     else:
-        sqlcat = """select distinct tabname
+        sqlcat = """select tabname
                       from syscat.tables
                      where tabschema = ?
                        and type = 'T'
                      order by tabname;"""
 
-    try:
-        stmtcat = ibm_db.prepare(_hdbc, sqlcat)
-        parameters = (str(schema.upper()),)
+    stmtcat = ibm_db.prepare(_hdbc, sqlcat)
+    parameters = (schema,)
+
+    if ibm_db.execute(stmtcat, parameters):
+        # fetch_row + result avoids building a dict per catalog row
+        while ibm_db.fetch_row(stmtcat):
+            temp_list.append(ibm_db.result(stmtcat, 0))
+
+    ibm_db.free_stmt(stmtcat)
 
-        if ibm_db.execute(stmtcat, parameters):
-            cat_row = ibm_db.fetch_assoc(stmtcat)
-            while cat_row:
-                # export_table(str(schema.upper()), cat_row["TABNAME"])
-                temp_list.append(cat_row["TABNAME"])
-                cat_row = ibm_db.fetch_assoc(stmtcat)
+    return tuple(temp_list)
 
-        ibm_db.free_stmt(stmtcat)
 
+def table_list(schema, allow_views=False) -> []:
+    """Get list of tables in schema"""
+    global _hdbc
+
+    try:
+        return list(_table_list_cached(id(_hdbc), str(schema.upper()), allow_views))
     except Exception as err:
         print(err)
         db_error(False)
         return None
-
-    return temp_list
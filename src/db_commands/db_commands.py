@@ -26,7 +26,8 @@
 import sys
 import click
 from db2_helpers import db_connect, db_connect_prompt, db_connected, db_disconnect, \
-    db_load_settings, db_save_settings, db_show_settings, db_keys_lock, db_keys_unlock
+    db_load_settings, db_save_settings, db_show_settings, db_keys_lock, db_keys_unlock, \
+    password_to_key
 
 # --------------------------------------------------
 # Defaults for this program
@@ -60,15 +61,22 @@ def db_credentials(action, database, hostname, environment, password, show):
    be encrypted/decrypted using the lock/unlock actions with a password.
     """
 
+    # lock/unlock touch only the secret key file, so dispatch before
+    # any of the database/hostname/environment handling
+    if action == "lock":
+        db_keys_lock(password)
+        password_to_key.cache_clear()
+        return
+    if action == "unlock":
+        db_keys_unlock(password)
+        password_to_key.cache_clear()
+        return
+
     use_database = database.lower()
     use_hostname = hostname.lower()
     use_environment = environment.lower()
 
-    if action == "lock":
-        db_keys_lock(password)
-    elif action == "unlock":
-        db_keys_unlock(password)
-    elif action == "reset":
+    if action == "reset":
         print("Reset requested, enter new credentials")
         settings = db_connect_prompt(use_database, use_hostname)
         settings["environment"] = use_environment
@@ -123,3 +131,6 @@ def db_credentials(action, database, hostname, environment, password, show):
     else:
         print("Unexpected action")
         sys.exit(1)
+
+    # Drop any derived keys cached during this invocation
+    password_to_key.cache_clear()
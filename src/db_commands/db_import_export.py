@@ -21,12 +21,25 @@
 # TODO: Avoid replacing actual data with empty file (add --force) ???
 # TODO: Do we need to handle "not null" fields that are zero-length strings?
 
+import io
+import os
 import sys
 import csv
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 import click
 import ibm_db
-from db2_helpers import db_connect, db_connected, db_disconnect, db_load_settings, db_error, table_list
+from db2_helpers import db_connect, db_connected, db_disconnect, db_load_settings, \
+    db_error, db_pool_reset, table_list
+
+# pyarrow parses CSV natively at roughly memory bandwidth; imports fall
+# back to the stdlib csv reader when it is not installed
+try:
+    import pyarrow
+    import pyarrow.csv as _pyarrow_csv
+except ImportError:
+    _pyarrow_csv = None
 
 # --------------------------------------------------
 # Defaults for this program
@@ -38,16 +51,14 @@ _default_schema = "db2inst1"
 _default_file_location = "./db"
 _default_folder_mask = 0o775
 
-# --------------------------------------------------
-# Global variables for use across functions
-# --------------------------------------------------
-_hdbc = None
-_sqlerror = None
-_sqlcode = None
-_sqlstate = None
-_headers_expected = True
-_write_headers = True
-_folder = Path()
+# Rows shipped per ibm_db.execute_many call; tune DB_BATCH_ROWS down
+# if wide rows push the server's statement memory limit
+_batch_rows = int(os.environ.get("DB_BATCH_ROWS", "5000"))
+_fetch_rows = 10000  # Rows buffered per csv writerows call on export
+
+# Per-worker-process state for --jobs: each pool worker opens its own
+# connection in _pool_init; everything else travels as arguments
+_worker = {"hdbc": None, "folder": None}
 
 
 # --------------------------------------------------
@@ -67,10 +78,13 @@ _folder = Path()
               default=_default_file_location, show_default=True)
 @click.option("--headers/--no-headers", help="Write header row to output",
               is_flag=True, default=True, show_default=True)
+@click.option("--bulk/--no-bulk", help="Use server-side EXPORT (no header row; server must write to the file location)",
+              is_flag=True, default=False, show_default=True)
 @click.option("--all-tables", "--all", "-A", help="All tables in schema", is_flag=True, default=False)
 @click.option("--table", "-T", help="table name")
+@click.option("--jobs", "-J", help="Worker processes for --all-tables", default=1, show_default=True)
 @click.option("--password", "--pwd", "-P", help="Pass phrase for secret key", default=None)
-def db_export(database, hostname, environment, schema, location, headers, all_tables, table, password):
+def db_export(database, hostname, environment, schema, location, headers, bulk, all_tables, table, jobs, password):
     """DB Export from Table to CSV file
 
     Export tables from a Db2 database to CSV file(s).
@@ -84,25 +98,19 @@ def db_export(database, hostname, environment, schema, location, headers, all_ta
     documents.
     """
 
-    global _hdbc, _sqlerror, _sqlcode, _sqlstate
-    global _folder, _write_headers
-    global _default_file_location, _default_folder_mask
-
     # --------------------------------------------------
     # Initialization
 
-    _folder = Path(location, environment, database.lower())
-    if not _folder.exists():
+    folder = Path(location, environment, database.lower())
+    if not folder.exists():
         try:
-            _folder.mkdir(_default_folder_mask, True, True)
+            folder.mkdir(_default_folder_mask, True, True)
         except OSError:
-            print("Unable to create directory", _folder)
+            print("Unable to create directory", folder)
             sys.exit(1)
 
-    _write_headers = headers
-
-    db_load_settings(database, hostname, environment, password)
-    _hdbc = db_connect()
+    settings = db_load_settings(database, hostname, environment, password)
+    hdbc = db_connect(settings)
 
     if not db_connected():
         print("Database connection failed, quitting.")
@@ -117,12 +125,20 @@ def db_export(database, hostname, environment, schema, location, headers, all_ta
 
     if all_tables:
         export_list = table_list(schema, False)
-        for table_name in export_list:
-            export_table(schema, table_name)
+        if jobs > 1 and export_list and len(export_list) > 1:
+            # Tables are independent, so fan the schema out across
+            # worker processes, each with its own connection
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_pool_init,
+                                     initargs=(settings, folder)) as executor:
+                list(executor.map(_export_worker, repeat(schema), export_list,
+                                  repeat(headers), repeat(bulk)))
+        else:
+            for table_name in export_list:
+                export_table(hdbc, folder, schema, table_name, headers, bulk)
     elif table:
         export_list = table_list(schema, True)
         if table.upper() in export_list:
-            export_table(schema, table)
+            export_table(hdbc, folder, schema, table, headers, bulk)
         else:
             print("Table", table, "not found in schema", schema)
             sys.exit(1)
@@ -148,10 +164,16 @@ def db_export(database, hostname, environment, schema, location, headers, all_ta
 @click.option("--schema", "-S", help="Schema", default=_default_schema, envvar="DB_SCHEMA", show_default=True)
 @click.option("--location", "-L", help="Directory location of files", default=_default_file_location, show_default=True)
 @click.option("--headers/--no-headers", help="Files contain header row", is_flag=True, default=True, show_default=True)
+@click.option("--bulk/--no-bulk", help="Use server-side IMPORT (file must be readable by the server)",
+              is_flag=True, default=False, show_default=True)
+@click.option("--truncate/--delete", "truncate", help="Clear tables with minimally logged TRUNCATE or logged DELETE",
+              default=True, show_default=True)
 @click.option("--all-tables", "--all", "-A", help="All tables in schema", is_flag=True, default=False)
 @click.option("--table", "-T", help="table name")
+@click.option("--jobs", "-J", help="Worker processes for --all-tables", default=1, show_default=True)
 @click.option("--password", "--pwd", "-P", help="Pass phrase for secret key", default=None)
-def db_import(database, hostname, environment, schema, location, headers, all_tables, table, password):
+def db_import(database, hostname, environment, schema, location, headers, bulk, truncate,
+              all_tables, table, jobs, password):
     """DB Import into tables from CSV file(s)
 
        Import tables into a Db2 database from CSV file(s).
@@ -167,22 +189,27 @@ def db_import(database, hostname, environment, schema, location, headers, all_ta
         documents.
     """
 
-    global _hdbc, _sqlerror, _sqlcode, _sqlstate
-    global _folder, _headers_expected
-    global _default_file_location
-
     # --------------------------------------------------
     # Initialization
 
-    _folder = Path(location, environment, database.lower())
-    if not _folder.exists():
-        print("Unable to use directory", _folder)
+    folder = Path(location, environment, database.lower())
+    if not folder.exists():
+        print("Unable to use directory", folder)
+        sys.exit(1)
+
+    if all_tables and table:
+        print("Specify either --all or --table, not both")
         sys.exit(1)
 
-    _headers_expected = headers
+    # Fail on a missing file before a connection is ever opened
+    if table:
+        filecsv = folder / f"{schema.lower()}-{table.lower()}.csv"
+        if not filecsv.is_file():
+            print("File", filecsv, "does not exist, nothing to import")
+            sys.exit(1)
 
-    db_load_settings(database, hostname, environment, password)
-    _hdbc = db_connect()
+    settings = db_load_settings(database, hostname, environment, password)
+    hdbc = db_connect(settings)
 
     if not db_connected():
         print("Database connection failed, quitting.")
@@ -191,17 +218,28 @@ def db_import(database, hostname, environment, schema, location, headers, all_ta
     # --------------------------------------------------
     # Main
 
-    if all_tables and table:
-        print("Specify either --all or --table, not both")
-        sys.exit(1)
-
     import_list = table_list(schema)
     if all_tables:
-        for table_name in import_list:
-            import_table(schema, table_name)
+        # Only tables whose CSV file is present: skipping the absent
+        # ones here avoids spending worker processes and round trips
+        # on tables that would only print a bypass message
+        import_list = [t for t in import_list
+                       if (folder / f"{schema.lower()}-{t.lower()}.csv").is_file()]
+        if not import_list:
+            print("No matching CSV files in", folder)
+        elif jobs > 1 and len(import_list) > 1:
+            # Tables are independent, so fan the schema out across
+            # worker processes, each with its own connection
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_pool_init,
+                                     initargs=(settings, folder)) as executor:
+                list(executor.map(_import_worker, repeat(schema), import_list,
+                                  repeat(headers), repeat(bulk), repeat(truncate)))
+        else:
+            for table_name in import_list:
+                import_table(hdbc, folder, schema, table_name, headers, bulk, truncate)
     elif table:
         if table.upper() in import_list:
-            import_table(schema, table)
+            import_table(hdbc, folder, schema, table, headers, bulk, truncate)
         else:
             print("Table", table, "not found in schema", schema)
             sys.exit(1)
@@ -216,24 +254,62 @@ def db_import(database, hostname, environment, schema, location, headers, all_ta
 # --------------------------------------------------
 
 
+def _pool_init(settings, folder):
+    """Set up a worker process for parallel export/import
+
+       Fork-started workers inherit the parent's connection pool, and
+       those handles refer to the parent's sockets. Drop the inherited
+       state first so db_connect opens this worker's own connection
+       instead of handing back the parent's.
+    """
+    db_pool_reset()
+    _worker["hdbc"] = db_connect(settings)
+    _worker["folder"] = folder
+
+
+def _export_worker(schema, tbname, write_headers, use_bulk):
+    """Export one table on a pool worker's connection"""
+    return export_table(_worker["hdbc"], _worker["folder"], schema, tbname, write_headers, use_bulk)
+
+
+def _import_worker(schema, tbname, headers_expected, use_bulk, use_truncate):
+    """Import one table on a pool worker's connection"""
+    return import_table(_worker["hdbc"], _worker["folder"], schema, tbname,
+                        headers_expected, use_bulk, use_truncate)
+
+
+def clear_table(hdbc, qname, use_truncate=True):
+    """Clear a table before import
+
+       Prefers TRUNCATE ... IMMEDIATE, which is minimally logged and
+       clears large tables in seconds, falling back to a logged DELETE
+       when truncation is refused (e.g. referential constraints). Note
+       that a truncate takes effect immediately and is not undone by
+       rolling back the surrounding transaction.
+    """
+    if use_truncate:
+        try:
+            ibm_db.exec_immediate(hdbc, f"truncate table {qname} immediate;")
+            return
+        except Exception:
+            db_error(True)
+    ibm_db.exec_immediate(hdbc, f"delete from {qname};")
+
+
 # noinspection PyBroadException
-def get_index(schema, tbname):
+def get_index(hdbc, schema, tbname):
     """Get index for table"""
 
-    global _hdbc
-
-    index_fields = ""
+    key_columns = []
 
     try:
-        ixstmt = ibm_db.primary_keys(_hdbc, None, schema, tbname)
+        ixstmt = ibm_db.primary_keys(hdbc, None, schema, tbname)
 
         if ixstmt:
             data_row = ibm_db.fetch_tuple(ixstmt)
-            delimiter = ""
             while data_row:
-                index_fields = index_fields + delimiter + data_row[3]
-                data_row = ibm_db.fetch_assoc(ixstmt)
-                delimiter = ","
+                key_columns.append(data_row[3])
+                data_row = ibm_db.fetch_tuple(ixstmt)
 
         ibm_db.free_stmt(ixstmt)
 
@@ -242,53 +318,86 @@ def get_index(schema, tbname):
         db_error(False)
         return None
 
-    return index_fields
+    return ",".join(key_columns)
 
 
 # noinspection PyBroadException
-def export_table(schema, tbname):
+def export_table(hdbc, folder, schema, tbname, write_headers=True, use_bulk=False):
     """Export the specified table to a CSV file"""
 
-    global _folder, _write_headers
-    global _hdbc
+    index_columns = get_index(hdbc, schema, tbname)
 
-    index_columns = get_index(schema, tbname)
+    # Quoted qualified name, computed once and shared by every statement
+    qname = f'"{schema.upper()}"."{tbname.upper()}"'
 
     if index_columns:
-        sql_text = "select * from " \
-                   + schema.upper() + "." + tbname.upper() \
-                   + " order by " \
-                   + index_columns + ";"
+        sql_text = f"select * from {qname} order by {index_columns};"
     else:
-        sql_text = "select * from " \
-                   + schema.upper() + "." + tbname.upper() \
-                   + " order by 1;"
+        sql_text = f"select * from {qname} order by 1;"
 
-    filecsv = Path(_folder, str(schema.lower() + "-" + tbname.lower() + ".csv"))
-    filetmp = Path(_folder, str("tmp_" + schema.lower() + "-" + tbname.lower() + ".csv"))
+    base = f"{schema.lower()}-{tbname.lower()}"
+    filecsv = folder / f"{base}.csv"
+    filetmp = folder / f"tmp_{base}.csv"
     count_table_rows = 0
     count_records = 0
 
+    if use_bulk:
+        # The Db2 engine writes the file itself, so no row ever moves
+        # through Python; only works when the server can write to the
+        # file location, and EXPORT OF DEL produces no header row
+        cmd = f"EXPORT TO '{filetmp.resolve()}' OF DEL MESSAGES ON SERVER " \
+              + f"SELECT * FROM {qname} ORDER BY {index_columns or '1'}"
+        sqltxt = "CALL SYSPROC.ADMIN_CMD('" + cmd.replace("'", "''") + "')"
+        try:
+            ibm_db.exec_immediate(hdbc, sqltxt)
+            filecsv.unlink(True)
+            filetmp.rename(filecsv)
+            print("Table:", tbname, "exported via server-side EXPORT")
+            return True
+        except Exception:
+            db_error(True)
+            print("Server-side EXPORT failed, using row-level export")
+
     try:
-        stmt = ibm_db.prepare(_hdbc, sql_text)
-        tbcolumns = get_columns(stmt)
+        stmt = ibm_db.prepare(hdbc, sql_text)
+        # Forward-only cursor with rowset prefetch lets the driver
+        # return blocks of rows per network round trip instead of one
+        try:
+            ibm_db.set_option(stmt, {ibm_db.SQL_ATTR_CURSOR_TYPE: ibm_db.SQL_CURSOR_FORWARD_ONLY}, 2)
+            ibm_db.set_option(stmt, {ibm_db.SQL_ATTR_ROWCOUNT_PREFETCH: ibm_db.SQL_ROWCOUNT_PREFETCH_ON}, 2)
+        except Exception:
+            pass  # Older drivers may lack these statement options
+        tbcolumns, coltypes = get_columns(stmt)
+        convert = _row_converter(coltypes)
 
         if ibm_db.execute(stmt):
-            data_row = ibm_db.fetch_assoc(stmt)
-            # with open(filetmp, "w", newline="\r\n",encoding="utf-8-sig") as fileout:
-
-            with open(filetmp, "w") as fileout:
-                writer = csv.DictWriter(fileout, tbcolumns)
-                # writer = csv.DictWriter(fileout, tbcolumns,
-                # delimiter=",", quotechar=""", quoting=csv.QUOTE_NONNUMERIC)
-                if _write_headers:
-                    writer.writeheader()
+            # Unbuffered binary file under an explicit 4 MiB buffer:
+            # the encoder fills the buffer directly and the kernel sees
+            # one large write per 4 MiB instead of many small flushes
+            with io.TextIOWrapper(
+                    io.BufferedWriter(open(filetmp, "wb", buffering=0),
+                                      buffer_size=4 * 1024 * 1024),
+                    encoding="utf-8", newline="") as fileout:
+                # Tuple rows into a plain csv.writer: no dict per row
+                # and column order resolved once, with batched writes
+                writer = csv.writer(fileout, quoting=csv.QUOTE_MINIMAL)
+                if write_headers:
+                    writer.writerow(tbcolumns)
                     count_records += 1
+                batch = []
+                data_row = ibm_db.fetch_tuple(stmt)
                 while data_row:
-                    writer.writerow(data_row)
-                    count_table_rows += 1
-                    count_records += 1
-                    data_row = ibm_db.fetch_assoc(stmt)
+                    batch.append(data_row if convert is None else convert(data_row))
+                    if len(batch) >= _fetch_rows:
+                        writer.writerows(batch)
+                        count_table_rows += len(batch)
+                        count_records += len(batch)
+                        batch.clear()
+                    data_row = ibm_db.fetch_tuple(stmt)
+                if batch:
+                    writer.writerows(batch)
+                    count_table_rows += len(batch)
+                    count_records += len(batch)
 
         ibm_db.free_stmt(stmt)
 
@@ -306,37 +415,117 @@ def export_table(schema, tbname):
 
 # noinspection PyBroadException
 def get_columns(stmt):
-    """Get column information for prepared SELECT statement"""
+    """Get column names and types for prepared SELECT statement"""
 
     columns = []
+    coltypes = []
     colcount = 0
     try:
         colname = ibm_db.field_name(stmt, colcount)
         while colname:
             columns.append(colname)
+            coltypes.append(ibm_db.field_type(stmt, colcount))
             colcount += 1
             colname = ibm_db.field_name(stmt, colcount)
-        return columns
+        return columns, coltypes
 
     except Exception as err:
         print(err)
         db_error(False)
+        return None, None
+
+
+# Column types whose values are safe to pre-stringify for csv.writer:
+# never contain separators or quotes, so QUOTE_MINIMAL finds nothing
+# to escape and the writer skips per-field quoting work
+_numeric_types = frozenset(("smallint", "int", "bigint", "real", "float", "double", "decimal", "decfloat"))
+
+
+def _row_converter(coltypes):
+    """Build a per-row converter that pre-stringifies numeric columns
+
+       Returns None when the table has no numeric columns, in which
+       case rows can go to the csv writer unchanged.
+    """
+    if not coltypes or not any(ftype in _numeric_types for ftype in coltypes):
         return None
+    convs = tuple(str if ftype in _numeric_types else None for ftype in coltypes)
+
+    def convert(row):
+        return tuple(col if func is None or col is None else func(col)
+                     for func, col in zip(convs, row))
+    return convert
+
+
+def _csv_header(filecsv):
+    """Read just the header row of a CSV file"""
+    with open(filecsv, "r", encoding="utf-8-sig", newline="") as filein:
+        return next(csv.reader(filein), None)
+
+
+def _make_row_func(n_cols):
+    """Compile a row constructor specialized to the column count
+
+       The generated function builds the tuple in one straight-line
+       expression with the empty-string-to-None test inlined per field,
+       with no loop or per-field call left in the hot path.
+    """
+    body = ", ".join(f"None if r[{i}] == '' else r[{i}]" for i in range(n_cols))
+    namespace = {}
+    # Source is built purely from integer column indexes
+    exec(f"def make_row(r): return ({body},)", namespace)
+    return namespace["make_row"]
+
+
+def _csv_rows(filecsv, n_cols, headers_expected):
+    """Yield normalized row tuples using the stdlib csv reader"""
+    make_row = _make_row_func(n_cols)
+    with open(filecsv, "r", buffering=1048576, newline="\r\n", encoding="utf-8-sig") as filein:
+        reader = csv.reader(filein)
+        if headers_expected:
+            next(reader, None)
+        for recno, row in enumerate(reader, 2 if headers_expected else 1):
+            if len(row) != n_cols:
+                raise ValueError(f"Row {recno} has {len(row)} columns, expected {n_cols}")
+            yield make_row(row)
+
+
+def _arrow_rows(filecsv, tbcolumns, headers_expected):
+    """Yield row tuples parsed by pyarrow's native CSV reader
+
+       Columns are read as strings with empty cells mapped to null, so
+       the rows come out identical to what _csv_rows produces; Arrow
+       itself rejects rows with the wrong column count.
+    """
+    read_options = _pyarrow_csv.ReadOptions(block_size=8 << 20, column_names=tbcolumns,
+                                            skip_rows=1 if headers_expected else 0)
+    # null_values=[""] restricts nulls to empty cells; Arrow's default
+    # list would also turn literal "NULL"/"NA"/"NaN" strings into nulls
+    convert_options = _pyarrow_csv.ConvertOptions(
+        column_types={col: pyarrow.string() for col in tbcolumns},
+        null_values=[""], strings_can_be_null=True)
+    with open(filecsv, "rb") as filein:
+        # Consume the BOM the stdlib path's utf-8-sig strips, so both
+        # readers see the same first cell
+        if filein.read(3) != b"\xef\xbb\xbf":
+            filein.seek(0)
+        reader = _pyarrow_csv.open_csv(filein, read_options=read_options,
+                                       convert_options=convert_options)
+        for record_batch in reader:
+            yield from zip(*(column.to_pylist() for column in record_batch.columns))
 
 
 # noinspection PyBroadException
-def import_table(schema, tbname):
+def import_table(hdbc, folder, schema, tbname, headers_expected=True,
+                 use_bulk=False, use_truncate=True):
     """Import specified table from a CSV file"""
 
-    global _folder, _headers_expected
-    global _hdbc
+    # Quoted qualified name, computed once and shared by every statement
+    qname = f'"{schema.upper()}"."{tbname.upper()}"'
 
-    sqltxt = "select * from " \
-             + schema.upper() + "." + tbname.upper() \
-             + ";"
-    filecsv = Path(_folder, str(schema.lower() + "-" + tbname.lower() + ".csv"))
+    sqltxt = f"select * from {qname};"
+    filecsv = folder / f"{schema.lower()}-{tbname.lower()}.csv"
     count_table_rows = 0
-    count_records = 0
 
     print("Table:", tbname, "File:", filecsv)
 
@@ -345,8 +534,8 @@ def import_table(schema, tbname):
         return
 
     try:
-        stmt = ibm_db.prepare(_hdbc, sqltxt)
-        tbcolumns = get_columns(stmt)
+        stmt = ibm_db.prepare(hdbc, sqltxt)
+        tbcolumns, _ = get_columns(stmt)
         ibm_db.free_stmt(stmt)
 
     except Exception as err:
@@ -354,67 +543,88 @@ def import_table(schema, tbname):
         db_error(False)
         return False
 
-    try:
-        sqltxt = "delete from " + schema + "." + tbname + ";"
-        ibm_db.exec_immediate(_hdbc, sqltxt)
+    # get_columns reports its own error and returns (None, None)
+    if not tbcolumns:
+        return False
 
-    except Exception:
+    # Validate the header before clearing anything: a truncate cannot
+    # be undone by rolling back, so a mismatched file must be rejected
+    # while the table still has its rows
+    if headers_expected:
+        header = _csv_header(filecsv)
+        if header and [col.upper() for col in header] != [col.upper() for col in tbcolumns]:
+            print("Header row in", filecsv, "does not match table columns, bypassing table")
+            return False
+
+    if use_bulk:
+        # ADMIN_CMD commits on its own, so clear the table under
+        # autocommit first, then let the Db2 engine stream the file
+        # through its bulk path; only works when the server can read
+        # the file itself
+        try:
+            clear_table(hdbc, qname, use_truncate)
+        except Exception:
+            db_error(False)
+            return False
+        cmd = f"IMPORT FROM '{filecsv.resolve()}' OF DEL" \
+              + (" SKIPCOUNT 1" if headers_expected else "") \
+              + f" INSERT INTO {qname}"
+        sqltxt = "CALL SYSPROC.ADMIN_CMD('" + cmd.replace("'", "''") + "')"
+        try:
+            ibm_db.exec_immediate(hdbc, sqltxt)
+            print("Table:", tbname, "imported via server-side IMPORT")
+            return True
+        except Exception:
+            db_error(True)
+            print("Server-side IMPORT failed, using row-level import")
+
+    # Prepare the INSERT once from the table's own column list rather
+    # than re-deriving it from the file's header row
+    cols_sql = ",".join(f'"{col}"' for col in tbcolumns)
+    marks = ",".join(["?"] * len(tbcolumns))
+    sqltxt = f"INSERT INTO {qname} ({cols_sql}) VALUES({marks});"
+    try:
+        stmt = ibm_db.prepare(hdbc, sqltxt)
+    except Exception as err:
+        # print("Error on Prepare")
+        # print("Message",ibm_db.stmt_errormsg())
+        print(err)
         db_error(False)
         return False
 
-    first = True
-    with open(filecsv, "r", newline="\r\n", encoding="utf-8-sig") as filein:
-        reader = csv.reader(filein)
-        for row in reader:
-            count_records += 1
-            if first:
-                first = False
-                # TODO:  Check first row for headers, if present make sure they match the column list
-                #        If the list is "short" then adjust our inserts appropriately
-                #        If not headers, handle as a data row
-                inserttxt = "INSERT INTO " + schema + "." + tbname + " ("
-                valuestxt = ") VALUES("
-                colcomma = ""
-                for col in row:
-                    inserttxt = inserttxt + colcomma + col
-                    valuestxt = valuestxt + colcomma + "?"
-                    colcomma = ","
-                sqltxt = inserttxt + valuestxt + ");"
-                try:
-                    stmt = ibm_db.prepare(_hdbc, sqltxt)
-                except Exception as err:
-                    # print("Error on Prepare")
-                    # print("Message",ibm_db.stmt_errormsg())
-                    print(err)
-                    db_error(False)
-                    return False
-            else:
-                try:
-                    variables = []
-                    variable_count = 0
-                    for col in row:
-                        if col == "":
-                            variables.append(None)
-                        else:
-                            variables.append(col)
-                        ibm_db.bind_param(stmt, variable_count + 1, variables[variable_count])
-                        variable_count += 1
-                except Exception as err:
-                    # print("Error on execution of bind_param")
-                    # print("Message",ibm_db.stmt_errormsg())
-                    print(err)
-                    db_error(False)
-                    return False
-
-                try:
-                    ibm_db.execute(stmt)
-                    count_table_rows += 1
-                except Exception as err:
-                    # print("Error on execution of Insert")
-                    # print("Message",ibm_db.stmt_errormsg())
-                    print(err)
-                    db_error(False)
-                    return False
+    # Clear and batched inserts run in one transaction: per-row
+    # commits dominate large imports. With --delete a failure rolls
+    # the table back to its previous contents; the default TRUNCATE
+    # is not undone by rollback, so a failure then leaves it empty
+    ibm_db.autocommit(hdbc, ibm_db.SQL_AUTOCOMMIT_OFF)
+    try:
+        clear_table(hdbc, qname, use_truncate)
+        if _pyarrow_csv is not None:
+            rows = _arrow_rows(filecsv, tbcolumns, headers_expected)
+        else:
+            rows = _csv_rows(filecsv, len(tbcolumns), headers_expected)
+        # Reuse one batch-sized slot list across the whole file
+        # instead of allocating per row
+        batch = [None] * _batch_rows
+        batch_len = 0
+        for row in rows:
+            batch[batch_len] = row
+            batch_len += 1
+            if batch_len >= _batch_rows:
+                count_table_rows += ibm_db.execute_many(stmt, tuple(batch))
+                batch_len = 0
+        if batch_len:
+            count_table_rows += ibm_db.execute_many(stmt, tuple(batch[:batch_len]))
+        ibm_db.commit(hdbc)
+    except Exception as err:
+        # print("Error on execution of Insert")
+        # print("Message",ibm_db.stmt_errormsg())
+        print(err)
+        db_error(False)
+        ibm_db.rollback(hdbc)
+        return False
+    finally:
+        ibm_db.autocommit(hdbc, ibm_db.SQL_AUTOCOMMIT_ON)
 
     try:
         ibm_db.free_stmt(stmt)